@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 import argparse
+import functools
 import logging
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from typing import Iterable, Tuple
 
@@ -31,6 +33,106 @@ from .render import render_wrl_to_png
 logger = logging.getLogger("cosmo_surface_viewer")
 
 
+def _load_mesh_cache(
+   cache_path: str,
+   mtime: float,
+   mesh_params: np.ndarray,
+   mesh_method: str,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray] | None:
+   """Return cached (points, charges, potentials, areas, faces) or None if stale."""
+   if not os.path.exists(cache_path):
+      return None
+   try:
+      with np.load(cache_path, allow_pickle=False) as z:
+         if float(z["mtime"]) != mtime:
+            return None
+         if not np.array_equal(z["mesh_params"], mesh_params):
+            return None
+         if str(z["mesh_method"]) != mesh_method:
+            return None
+         return z["points"], z["charges"], z["potentials"], z["areas"], z["faces"]
+   except Exception:
+      logger.warning("Ignoring unreadable mesh cache: %s", cache_path)
+      return None
+
+
+def _build_one(
+   fname: str,
+   input: os.PathLike | str,
+   output: os.PathLike | str,
+   *,
+   color_by: str,
+   neighbor_radius: float,
+   max_neighbors: int,
+   neighbors_threshold: float,
+   mesh_method: str,
+   vmin: float | None,
+   vmax: float | None,
+   cmap: str,
+   robust: bool,
+   robust_pct: float,
+   force: bool = False,
+) -> str:
+   """Parse one .cpcm file and write its .wrl and .pqr outputs.
+
+   Module-level so it is picklable for ProcessPoolExecutor workers.
+   """
+   in_path = os.path.join(input, fname)
+   wrl_path = os.path.join(output, fname.replace(".cpcm", ".wrl"))
+   pqr_charge_path = os.path.join(output, fname.replace(".cpcm", "_charge.pqr"))
+   pqr_potential_path = os.path.join(output, fname.replace(".cpcm", "_potential.pqr"))
+
+   logger.info("[WRL] Building: %s", fname)
+   # Parse + mesh results are cached beside the input keyed on mtime and mesh
+   # params, so a deleted .wrl does not force a full build_faces rerun
+   cache_path = in_path + ".cache.npz"
+   mtime = os.path.getmtime(in_path)
+   mesh_params = np.array([neighbor_radius, float(max_neighbors), neighbors_threshold])
+   cached = None if force else _load_mesh_cache(cache_path, mtime, mesh_params, mesh_method)
+   if cached is not None:
+      logger.info("[WRL] Using mesh cache for: %s", fname)
+      points, charges, potentials, areas, faces = cached
+   else:
+      points, charges, potentials, areas, owners = parse_cpcm(in_path)
+      faces = build_faces(
+         points,
+         areas,
+         owners,
+         neighbor_radius=neighbor_radius,
+         max_neighbors=max_neighbors,
+         neighbors_threshold=neighbors_threshold,
+         method=mesh_method,
+      )
+      np.savez(
+         cache_path,
+         points=points,
+         charges=charges,
+         potentials=potentials,
+         areas=areas,
+         faces=faces,
+         mtime=mtime,
+         mesh_params=mesh_params,
+         mesh_method=mesh_method,
+      )
+   mode = str(color_by).lower()
+   if mode in {"potential", "potentials"}:
+      values = potentials
+   elif mode in {"charge", "charges"}:
+      values = charges
+   elif mode in {"surface-charge", "surface_charge", "sigma"}:
+      area_bohr = areas / (ANGSTROM_PER_BOHR ** 2)
+      values = charges * area_bohr
+   else:
+      raise ValueError(f"Unsupported color_by option: {color_by}")
+   colors = map_colors(values, vmin=vmin, vmax=vmax, cmap_name=cmap, robust=robust, robust_pct=robust_pct)
+   write_vrml(points, faces, colors, wrl_path)
+
+   # Write PQR files with charge and potential
+   write_pqr(points, charges, pqr_charge_path)
+   write_pqr(points, potentials, pqr_potential_path)
+   return fname
+
+
 def process_all(
    input: os.PathLike | str,
    output: os.PathLike | str,
@@ -41,6 +143,7 @@ def process_all(
    neighbor_radius: float = 1.0,
    max_neighbors: int = 15,
    neighbors_threshold: float = 1.5,
+   mesh_method: str = "neighbors",
    vmin: float | None = None,
    vmax: float | None = None,
    cmap: str = "jet",
@@ -50,65 +153,76 @@ def process_all(
    background: str = "white",
    smooth_shading: bool = False,
    enable_aa: bool = True,
+   jobs: int | None = None,
 ) -> None:
    os.makedirs(output, exist_ok=True)
 
    # Echo mesh construction parameters for visibility
    print(f"Mesh params: neighbor_radius={neighbor_radius}, max_neighbors={max_neighbors}, neighbors_threshold={neighbors_threshold}")
 
-   cpcm_files = sorted([f for f in os.listdir(input) if f.endswith(".cpcm")])
+   with os.scandir(input) as it:
+      cpcm_files = sorted(e.name for e in it if e.is_file() and e.name.endswith(".cpcm"))
    total_cpcm = len(cpcm_files)
    print(f"Found {total_cpcm} .cpcm files in '{input}'")
+
+   # Scan the output directory once; both passes test against this set
+   # instead of issuing an os.path.exists stat per file
+   with os.scandir(output) as it:
+      existing = {e.name for e in it if e.is_file()}
+
+   to_build: list[str] = []
    for idx, fname in enumerate(cpcm_files, start=1):
-      in_path = os.path.join(input, fname)
-      wrl_path = os.path.join(output, fname.replace(".cpcm", ".wrl"))
-      pqr_charge_path = os.path.join(output, fname.replace(".cpcm", "_charge.pqr"))
-      pqr_potential_path = os.path.join(output, fname.replace(".cpcm", "_potential.pqr"))
-
-      if not os.path.exists(wrl_path) or force:
-         print(f"[{idx}/{total_cpcm}] Building .wrl from: {fname}")
-         logger.info("[WRL] Building: %s", fname)
-         points, charges, potentials, areas, owners = parse_cpcm(in_path)
-         faces = build_faces(
-            points,
-            areas,
-            owners,
-            neighbor_radius=neighbor_radius,
-            max_neighbors=max_neighbors,
-            neighbors_threshold=neighbors_threshold,
-         )
-         mode = str(color_by).lower()
-         if mode in {"potential", "potentials"}:
-            values = potentials
-         elif mode in {"charge", "charges"}:
-            values = charges
-         elif mode in {"surface-charge", "surface_charge", "sigma"}:
-            area_bohr = areas / (ANGSTROM_PER_BOHR ** 2)
-            values = charges * area_bohr
-         else:
-            raise ValueError(f"Unsupported color_by option: {color_by}")
-         colors = map_colors(values, vmin=vmin, vmax=vmax, cmap_name=cmap, robust=robust, robust_pct=robust_pct)
-         write_vrml(points, faces, colors, wrl_path)
-         
-         # Write PQR files with charge and potential
-         print(f"[{idx}/{total_cpcm}] Writing PQR files for: {fname}")
-         write_pqr(points, charges, pqr_charge_path)
-         write_pqr(points, potentials, pqr_potential_path)
+      if fname.replace(".cpcm", ".wrl") not in existing or force:
+         to_build.append(fname)
       else:
          print(f"[{idx}/{total_cpcm}] Skipping (exists): {fname}")
          logger.info("[WRL] Exists:   %s", fname)
 
-   wrl_files = sorted([f for f in os.listdir(output) if f.endswith(".wrl")])
+   build_one = functools.partial(
+      _build_one,
+      input=input,
+      output=output,
+      color_by=color_by,
+      neighbor_radius=neighbor_radius,
+      max_neighbors=max_neighbors,
+      neighbors_threshold=neighbors_threshold,
+      mesh_method=mesh_method,
+      vmin=vmin,
+      vmax=vmax,
+      cmap=cmap,
+      robust=robust,
+      robust_pct=robust_pct,
+      force=force,
+   )
+   if jobs is None:
+      jobs = os.cpu_count() or 1
+   total_build = len(to_build)
+   if jobs == 1 or total_build <= 1:
+      for idx, fname in enumerate(to_build, start=1):
+         print(f"[{idx}/{total_build}] Building .wrl from: {fname}")
+         build_one(fname)
+   else:
+      # Each file is an independent parse -> build_faces -> write unit
+      with ProcessPoolExecutor(max_workers=min(jobs, total_build)) as ex:
+         futures = [ex.submit(build_one, fname) for fname in to_build]
+         for idx, fut in enumerate(as_completed(futures), start=1):
+            fname = fut.result()
+            print(f"[{idx}/{total_build}] Built .wrl from: {fname}")
+   # Account for freshly written files without re-scanning the directory
+   existing.update(f.replace(".cpcm", ".wrl") for f in to_build)
+
+   wrl_files = sorted(n for n in existing if n.endswith(".wrl"))
    total_wrl = len(wrl_files)
    print(f"Found {total_wrl} .wrl files in '{output}'")
    for idx, fname in enumerate(wrl_files, start=1):
       wrl_path = os.path.join(output, fname)
       png_path = os.path.join(output, fname.replace(".wrl", ".png"))
-      if os.path.exists(png_path) and not force and off_screen:
+      png_exists = fname.replace(".wrl", ".png") in existing
+      if png_exists and not force and off_screen:
          print(f"[{idx}/{total_wrl}] Skipping render (exists): {fname}")
          logger.info("[PNG] Exists:   %s", fname)
          continue
-      if os.path.exists(png_path) and not force and not off_screen:
+      if png_exists and not force and not off_screen:
          print(f"[{idx}/{total_wrl}] Opening onscreen (exists): {fname}")
       else:
          print(f"[{idx}/{total_wrl}] Rendering .png from: {fname}")
@@ -138,6 +252,13 @@ def main(argv: Iterable[str] | None = None) -> int:
    parser.add_argument("--neighbor-radius", type=float, default=1.0, help="Radius for neighbor search (Angstrom)")
    parser.add_argument("--max-neighbors", type=int, default=15, help="Max neighbors per point")
    parser.add_argument("--neighbors-threshold", type=float, default=1.5, help="Distance threshold factor for triangle acceptance")
+   parser.add_argument(
+      "--mesh-method",
+      type=str,
+      choices=["neighbors", "delaunay"],
+      default="neighbors",
+      help="Face construction: 'neighbors' (default) or per-sphere 'delaunay' triangulation",
+   )
 
    parser.add_argument("--vmin", type=float, default=None, help="Lower bound for color mapping")
    parser.add_argument("--vmax", type=float, default=None, help="Upper bound for color mapping")
@@ -157,6 +278,8 @@ def main(argv: Iterable[str] | None = None) -> int:
    parser.add_argument("--background", type=str, default="white", help="Background color name or hex code")
    parser.add_argument("--no-aa", dest="aa", action="store_false", help="Disable anti-aliasing")
 
+   parser.add_argument("--jobs", type=int, default=None, help="Parallel workers for .wrl building (default: CPU count)")
+
    parser.add_argument("-v", "--verbose", action="count", default=0, help="Increase verbosity (-v, -vv)")
 
    args = parser.parse_args(list(argv) if argv is not None else None)
@@ -187,6 +310,7 @@ def main(argv: Iterable[str] | None = None) -> int:
          neighbor_radius=args.neighbor_radius,
          max_neighbors=args.max_neighbors,
          neighbors_threshold=args.neighbors_threshold,
+         mesh_method=args.mesh_method,
          vmin=args.vmin,
          vmax=args.vmax,
          cmap=args.cmap,
@@ -195,6 +319,7 @@ def main(argv: Iterable[str] | None = None) -> int:
          window_size=window_size,
          background=args.background,
          enable_aa=args.aa,
+         jobs=args.jobs,
       )
    except Exception as e:
       logger.error("Failed: %s", e)
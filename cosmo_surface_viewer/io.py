@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+from io import BytesIO
 from pathlib import Path
 import numpy as np
 import logging
 
 logger = logging.getLogger("cosmo_surface_viewer.io")
 
+# Channel values are 0..255 ints emitted at fixed .3f precision, so every
+# possible output string can be precomputed once
+_COLOR_STR = [f"{i / 255:.3f}" for i in range(256)]
+
 
 def write_pqr(points: np.ndarray, values: np.ndarray, filename: Path | str, radius: float = 0.300) -> None:
     """Write points and values to PQR format file.
@@ -28,26 +33,43 @@ def write_pqr(points: np.ndarray, values: np.ndarray, filename: Path | str, radi
 def write_vrml(vertices: np.ndarray, faces: np.ndarray, colors: np.ndarray, filename: Path | str) -> None:
     p = Path(filename)
     p.parent.mkdir(parents=True, exist_ok=True)
-    with open(p, "w", encoding="utf-8") as f:
-        f.write("#VRML V2.0 utf8\n")
-        f.write("Shape {\n")
-        f.write("  geometry IndexedFaceSet {\n")
-        f.write("    coord Coordinate {\n")
-        f.write("      point [\n")
-        for v in vertices:
-            f.write(f"        {v[0]:.6f} {v[1]:.6f} {v[2]:.6f},\n")
-        f.write("      ]\n")
-        f.write("    }\n")
-        f.write("    color Color {\n")
-        f.write("      color [\n")
-        for c in colors:
-            f.write(f"        {c[0]/255:.3f} {c[1]/255:.3f} {c[2]/255:.3f},\n")
-        f.write("      ]\n")
-        f.write("    }\n")
-        f.write("    coordIndex [\n")
-        for face in faces:
-            f.write(f"      {face[0]} {face[1]} {face[2]} -1,\n")
-        f.write("    ]\n")
-        f.write("  }\n")
-        f.write("}\n")
+    # Assemble the whole file in memory and flush it with a single write call
+    buf = BytesIO()
+    buf.write(
+        b"#VRML V2.0 utf8\n"
+        b"Shape {\n"
+        b"  geometry IndexedFaceSet {\n"
+        b"    coord Coordinate {\n"
+        b"      point [\n"
+    )
+    np.savetxt(buf, np.asarray(vertices), fmt="        %.6f %.6f %.6f,")
+    buf.write(
+        b"      ]\n"
+        b"    }\n"
+        b"    color Color {\n"
+        b"      color [\n"
+    )
+    color_rows = np.asarray(colors, dtype=np.intp).tolist()
+    if color_rows:
+        buf.write(
+            "\n".join(f"        {_COLOR_STR[r]} {_COLOR_STR[g]} {_COLOR_STR[b]}," for r, g, b in color_rows).encode("ascii")
+        )
+        buf.write(b"\n")
+    buf.write(
+        b"      ]\n"
+        b"    }\n"
+        b"    coordIndex [\n"
+    )
+    # .tolist() yields native ints, which format faster than ndarray scalars,
+    # and one join beats a savetxt %-format pass per row
+    face_rows = np.asarray(faces, dtype=int).tolist()
+    if face_rows:
+        buf.write("\n".join(f"      {a} {b} {c} -1," for a, b, c in face_rows).encode("ascii"))
+        buf.write(b"\n")
+    buf.write(
+        b"    ]\n"
+        b"  }\n"
+        b"}\n"
+    )
+    p.write_bytes(buf.getbuffer())
     logger.info("Wrote VRML: %s", str(p))
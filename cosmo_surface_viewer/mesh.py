@@ -4,9 +4,132 @@ import numpy as np
 import logging
 from scipy.spatial import cKDTree
 
+try:
+    from numba import njit, prange
+
+    _HAVE_NUMBA = True
+except ImportError:  # numba is an optional accelerator
+    _HAVE_NUMBA = False
+
 logger = logging.getLogger("cosmo_surface_viewer.mesh")
 
 
+if _HAVE_NUMBA:
+
+    @njit(cache=True, parallel=True, fastmath=True)
+    def _grid_neighbors_kernel(pts, owners, cell, sorted_lin, order, nx, ny, nz, r2, max_neighbors, nbr_idx):
+        """Radius search over a uniform grid: scan each point's cell plus the 26
+        adjacent cells, keeping the max_neighbors nearest same-owner points.
+
+        Cells are addressed by linear id; `sorted_lin`/`order` give the points
+        grouped per cell so each cell's slice is found by binary search.
+        Returns the neighbor count per point; indices land in nbr_idx rows
+        ordered by distance.
+        """
+        npts = pts.shape[0]
+        counts = np.zeros(npts, dtype=np.int64)
+        for i in prange(npts):
+            best_d2 = np.empty(max_neighbors, dtype=np.float64)
+            m = 0
+            for dx in range(-1, 2):
+                cx = cell[i, 0] + dx
+                if cx < 0 or cx >= nx:
+                    continue
+                for dy in range(-1, 2):
+                    cy = cell[i, 1] + dy
+                    if cy < 0 or cy >= ny:
+                        continue
+                    for dz in range(-1, 2):
+                        cz = cell[i, 2] + dz
+                        if cz < 0 or cz >= nz:
+                            continue
+                        lid = (cx * ny + cy) * nz + cz
+                        lo = np.searchsorted(sorted_lin, lid, side="left")
+                        hi = np.searchsorted(sorted_lin, lid, side="right")
+                        for pos in range(lo, hi):
+                            p = order[pos]
+                            if owners[p] != owners[i]:
+                                continue
+                            ddx = pts[i, 0] - pts[p, 0]
+                            ddy = pts[i, 1] - pts[p, 1]
+                            ddz = pts[i, 2] - pts[p, 2]
+                            d2 = ddx * ddx + ddy * ddy + ddz * ddz
+                            if d2 > r2:
+                                continue
+                            if m < max_neighbors:
+                                # Insertion sort into the (still short) list
+                                q = m
+                                while q > 0 and best_d2[q - 1] > d2:
+                                    best_d2[q] = best_d2[q - 1]
+                                    nbr_idx[i, q] = nbr_idx[i, q - 1]
+                                    q -= 1
+                                best_d2[q] = d2
+                                nbr_idx[i, q] = p
+                                m += 1
+                            elif d2 < best_d2[max_neighbors - 1]:
+                                q = max_neighbors - 1
+                                while q > 0 and best_d2[q - 1] > d2:
+                                    best_d2[q] = best_d2[q - 1]
+                                    nbr_idx[i, q] = nbr_idx[i, q - 1]
+                                    q -= 1
+                                best_d2[q] = d2
+                                nbr_idx[i, q] = p
+            counts[i] = m
+        return counts
+
+    @njit(cache=True, parallel=True, fastmath=True)
+    def _build_faces_kernel(pts, thr_r, offsets, indices, starts, out):
+        """Enumerate candidate triangles into preallocated per-point slices of `out`.
+
+        Neighbors are given in CSR form (`offsets`, `indices`). Each point i owns
+        the slice out[starts[i]:starts[i+1]], so prange iterations never contend.
+        Accepted triples are packed sorted into a single int64 key (21 bits per
+        index); returns the number of keys written per point.
+        """
+        npts = pts.shape[0]
+        counts = np.zeros(npts, dtype=np.int64)
+        for i in prange(npts):
+            pos = starts[i]
+            n = 0
+            for jj in range(offsets[i], offsets[i + 1]):
+                j = indices[jj]
+                if j == i:
+                    continue
+                dx = pts[i, 0] - pts[j, 0]
+                dy = pts[i, 1] - pts[j, 1]
+                dz = pts[i, 2] - pts[j, 2]
+                d2_ij = dx * dx + dy * dy + dz * dz
+                t_ij = thr_r[i] + thr_r[j]
+                ok_ij = d2_ij < t_ij * t_ij
+                for kk in range(offsets[j], offsets[j + 1]):
+                    k = indices[kk]
+                    if k == i:
+                        continue
+                    dx = pts[i, 0] - pts[k, 0]
+                    dy = pts[i, 1] - pts[k, 1]
+                    dz = pts[i, 2] - pts[k, 2]
+                    d2_ik = dx * dx + dy * dy + dz * dz
+                    t_ik = thr_r[i] + thr_r[k]
+                    if d2_ik >= t_ik * t_ik:
+                        continue
+                    ok = ok_ij
+                    if not ok:
+                        dx = pts[j, 0] - pts[k, 0]
+                        dy = pts[j, 1] - pts[k, 1]
+                        dz = pts[j, 2] - pts[k, 2]
+                        d2_jk = dx * dx + dy * dy + dz * dz
+                        t_jk = thr_r[j] + thr_r[k]
+                        ok = d2_jk < t_jk * t_jk
+                    if ok:
+                        a = min(i, min(j, k))
+                        c = max(i, max(j, k))
+                        b = i + j + k - a - c
+                        out[pos + n] = (np.int64(a) << 42) | (np.int64(b) << 21) | np.int64(c)
+                        n += 1
+            counts[i] = n
+        return counts
+
+
 def build_faces(
     points: np.ndarray,
     surface_areas: np.ndarray,
@@ -14,60 +137,262 @@ def build_faces(
     neighbor_radius: float = 1.0,
     max_neighbors: int = 15,
     neighbors_threshold: float = 1.5,
+    method: str = "neighbors",
 ) -> np.ndarray:
-    """Construct triangle faces using neighbor filtering and sphere ownership."""
-    logger.debug("build_faces called: neighbor_radius=%s, max_neighbors=%s, neighbors_threshold=%s", neighbor_radius, max_neighbors, neighbors_threshold)
-    tree = cKDTree(points)
-    faces_set: set[tuple[int, int, int]] = set()
-
-    # Precompute neighbors per point
-    neighbors: list[list[int]] = []
-    for i in range(len(points)):
-        nbrs = tree.query_ball_point(points[i], neighbor_radius, workers=-1)
-        owner_i = sphere_owners[i]
-        nbrs = [j for j in nbrs if sphere_owners[j] == owner_i]
-        if len(nbrs) > max_neighbors:
-            dists = np.linalg.norm(points[nbrs] - points[i], axis=1)
-            sorted_indices = np.argsort(dists)
-            nbrs = [nbrs[idx] for idx in sorted_indices[:max_neighbors]]
-        neighbors.append(nbrs)
-    # Debug: log neighbor statistics
-    try:
-        counts = [len(n) for n in neighbors]
-        import numpy as _np
-
-        logger.debug("neighbor counts: mean=%.2f max=%d", float(_np.mean(counts)), int(_np.max(counts)) if counts else 0)
-    except Exception:
-        pass
-
-    npts = len(points)
-    for i in range(npts):
-        if i % 100 == 0:
-            logger.info("Building faces: %d/%d", i + 1, npts)
-        r_i = float(np.sqrt(surface_areas[i] / np.pi))
-        for j in neighbors[i]:
-            if i == j:
-                continue
-            r_j = float(np.sqrt(surface_areas[j] / np.pi))
-            dist_ij = float(np.linalg.norm(points[i] - points[j]))
-            for k in neighbors[j]:
-                if i == k:
-                    continue
-                r_k = float(np.sqrt(surface_areas[k] / np.pi))
-                dist_ik = float(np.linalg.norm(points[i] - points[k]))
+    """Construct triangle faces using neighbor filtering and sphere ownership.
 
-                if dist_ij < neighbors_threshold * (r_i + r_j) and dist_ik < neighbors_threshold * (r_i + r_k):
-                    faces_set.add(tuple(sorted([i, j, k])))
+    method="neighbors" (default) enumerates neighbor triples as before;
+    method="delaunay" triangulates each sphere's points on its best-fit plane,
+    which scales as O(N log N) instead of O(N*K^2).
+    """
+    logger.debug("build_faces called: neighbor_radius=%s, max_neighbors=%s, neighbors_threshold=%s, method=%s", neighbor_radius, max_neighbors, neighbors_threshold, method)
+    pts = np.ascontiguousarray(points, dtype=np.float64)
+    if len(pts) >= (1 << 21):
+        raise ValueError("build_faces supports at most 2**21 surface points")
+    owners = np.ascontiguousarray(sphere_owners, dtype=np.int64)
 
-                dist_jk = float(np.linalg.norm(points[j] - points[k]))
-                if dist_jk < neighbors_threshold * (r_j + r_k) and dist_ik < neighbors_threshold * (r_i + r_k):
-                    faces_set.add(tuple(sorted([j, k, i])))
+    if method == "delaunay":
+        thr_r = neighbors_threshold * np.sqrt(np.asarray(surface_areas, dtype=np.float64) / np.pi)
+        faces = _build_faces_delaunay(pts, thr_r, owners)
+        logger.info("Faces built: %d", len(faces))
+        return faces
+    if method != "neighbors":
+        raise ValueError(f"Unsupported mesh method: {method}")
 
-    faces = np.array(list(faces_set), dtype=int)
+    # Precompute neighbors per point in CSR form (offsets, indices). The grid
+    # hash builds and queries in O(N) for uniform surface densities; without
+    # numba we fall back to one batched cKDTree query.
+    if _HAVE_NUMBA:
+        offsets, indices = _neighbors_grid(pts, owners, neighbor_radius, max_neighbors)
+    else:
+        offsets, indices = _neighbors_kdtree(pts, owners, neighbor_radius, max_neighbors)
+    deg = np.diff(offsets)
+    if deg.size:
+        logger.debug("neighbor counts: mean=%.2f max=%d", float(deg.mean()), int(deg.max()))
+
+    # One vectorized sqrt over the whole array instead of one per inner iteration;
+    # folding the threshold factor in makes the inner test (thr_r[a]+thr_r[b])**2
+    thr_r = neighbors_threshold * np.sqrt(np.asarray(surface_areas, dtype=np.float64) / np.pi)
+
+    if _HAVE_NUMBA:
+        cand = _enumerate_faces_numba(pts, thr_r, offsets, indices)
+    else:
+        cand = _enumerate_faces_numpy(pts, thr_r, offsets, indices)
+
+    if cand.size == 0:
+        faces = np.empty((0, 3), dtype=int)
+    else:
+        # Candidates arrive packed sorted into int64 keys (21 bits per index),
+        # so dedup is a 1D np.unique instead of a row-wise one
+        packed = np.unique(cand)
+        lo_mask = (1 << 21) - 1
+        faces = np.empty((packed.size, 3), dtype=int)
+        faces[:, 0] = packed >> 42
+        faces[:, 1] = (packed >> 21) & lo_mask
+        faces[:, 2] = packed & lo_mask
     logger.info("Faces built: %d", len(faces))
     return faces
 
 
+def _build_faces_delaunay(
+    pts: np.ndarray,
+    thr_r: np.ndarray,
+    owners: np.ndarray,
+) -> np.ndarray:
+    """Triangulate each sphere's points via 2D Delaunay on its best-fit plane.
+
+    COSMO surfaces expose roughly cap-shaped patches per sphere, so projecting a
+    patch onto its two principal axes is close to injective; triangles whose
+    edges exceed the distance threshold (spurious ones bridging fold-overs or
+    patch boundaries) are dropped afterwards.
+    """
+    from scipy.spatial import Delaunay, QhullError
+
+    parts: list[np.ndarray] = []
+    for owner in np.unique(owners):
+        idx = np.flatnonzero(owners == owner)
+        if idx.size < 3:
+            continue
+        sub = pts[idx]
+        centered = sub - sub.mean(axis=0)
+        # Principal axes of the patch; eigh returns ascending eigenvalues, so
+        # the last two columns span the best-fit plane
+        _, vecs = np.linalg.eigh(centered.T @ centered)
+        plane = centered @ vecs[:, 1:]
+        try:
+            tri = Delaunay(plane)
+        except QhullError:
+            logger.warning("Delaunay failed for sphere %d (%d points); skipping", int(owner), idx.size)
+            continue
+        t = idx[tri.simplices]
+        keep = np.ones(len(t), dtype=bool)
+        for a, b in ((0, 1), (0, 2), (1, 2)):
+            d2 = ((pts[t[:, a]] - pts[t[:, b]]) ** 2).sum(axis=1)
+            keep &= d2 < (thr_r[t[:, a]] + thr_r[t[:, b]]) ** 2
+        parts.append(t[keep])
+
+    if not parts:
+        return np.empty((0, 3), dtype=int)
+    faces = np.concatenate(parts).astype(int)
+    faces.sort(axis=1)
+    return np.unique(faces, axis=0)
+
+
+def _neighbors_kdtree(
+    pts: np.ndarray,
+    owners: np.ndarray,
+    neighbor_radius: float,
+    max_neighbors: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Neighbor search via one batched cKDTree query; returns CSR (offsets, indices)."""
+    tree = cKDTree(pts)
+    all_nbrs = tree.query_ball_point(pts, neighbor_radius, workers=-1, return_sorted=False)
+    neighbors: list[np.ndarray] = []
+    for i, nbrs in enumerate(all_nbrs):
+        arr = np.asarray(nbrs, dtype=np.int64)
+        arr = arr[owners[arr] == owners[i]]
+        if arr.size > max_neighbors:
+            d2 = ((pts[arr] - pts[i]) ** 2).sum(axis=1)
+            arr = arr[np.argsort(d2)[:max_neighbors]]
+        neighbors.append(arr)
+    deg = np.array([len(n) for n in neighbors], dtype=np.int64)
+    offsets = np.zeros(len(pts) + 1, dtype=np.int64)
+    np.cumsum(deg, out=offsets[1:])
+    indices = np.concatenate(neighbors) if offsets[-1] else np.empty(0, dtype=np.int64)
+    return offsets, indices
+
+
+def _neighbors_grid(
+    pts: np.ndarray,
+    owners: np.ndarray,
+    neighbor_radius: float,
+    max_neighbors: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Neighbor search via a uniform cell grid; returns CSR (offsets, indices).
+
+    Points are bucketed into cells of edge neighbor_radius, so any neighbor of a
+    point lies in its cell or one of the 26 adjacent ones. The kernel skips
+    cell coordinates outside [0, n): their linear ids would alias onto real
+    cells on narrow grids, scanning the same cell twice.
+    """
+    npts = len(pts)
+    if npts == 0:
+        return np.zeros(1, dtype=np.int64), np.empty(0, dtype=np.int64)
+    cell = np.floor((pts - pts.min(axis=0)) / neighbor_radius).astype(np.int64)
+    nx = int(cell[:, 0].max()) + 1
+    ny = int(cell[:, 1].max()) + 1
+    nz = int(cell[:, 2].max()) + 1
+    lin = (cell[:, 0] * ny + cell[:, 1]) * nz + cell[:, 2]
+    order = np.argsort(lin, kind="stable")
+    sorted_lin = lin[order]
+
+    nbr_idx = np.empty((npts, max_neighbors), dtype=np.int64)
+    counts = _grid_neighbors_kernel(
+        pts, owners, cell, sorted_lin, order, nx, ny, nz, float(neighbor_radius) ** 2, max_neighbors, nbr_idx
+    )
+    offsets = np.zeros(npts + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    indices = nbr_idx[np.arange(max_neighbors) < counts[:, None]]
+    return offsets, indices
+
+
+def _enumerate_faces_numba(
+    pts: np.ndarray,
+    thr_r: np.ndarray,
+    offsets: np.ndarray,
+    indices: np.ndarray,
+) -> np.ndarray:
+    """Run the JIT kernel on the CSR neighbor list; returns packed int64 keys."""
+    npts = len(pts)
+    deg = np.diff(offsets)
+
+    # Per-point capacity: every (j, k) with j in N(i), k in N(j) could be accepted
+    cap = np.zeros(npts, dtype=np.int64)
+    if indices.size:
+        red = np.add.reduceat(deg[indices], np.minimum(offsets[:-1], indices.size - 1))
+        cap = np.where(deg > 0, red, 0)
+    starts = np.zeros(npts + 1, dtype=np.int64)
+    np.cumsum(cap, out=starts[1:])
+
+    out = np.empty(int(starts[-1]), dtype=np.int64)
+    counts = _build_faces_kernel(pts, thr_r, offsets, indices, starts, out)
+
+    total = int(starts[-1])
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    # Compact the per-point slices down to the written prefixes
+    pos_in_seg = np.arange(total, dtype=np.int64) - np.repeat(starts[:-1], cap)
+    mask = pos_in_seg < np.repeat(counts, cap)
+    return out[mask]
+
+
+def _enumerate_faces_numpy(
+    pts: np.ndarray,
+    thr_r: np.ndarray,
+    offsets: np.ndarray,
+    indices: np.ndarray,
+) -> np.ndarray:
+    """Pure-NumPy fallback used when numba is not installed; returns packed int64 keys."""
+    npts = len(pts)
+    deg = np.diff(offsets)
+
+    triples: list[np.ndarray] = []
+    for i in range(npts):
+        if i % 1000 == 0:
+            logger.info("Building faces: %d/%d", i + 1, npts)
+        js = indices[offsets[i] : offsets[i + 1]]
+        js = js[js != i]
+        if js.size == 0:
+            continue
+        # Candidate (j, k) pairs: j in neighbors[i], k in neighbors[j]
+        J = np.repeat(js, deg[js])
+        K = np.concatenate([indices[offsets[j] : offsets[j + 1]] for j in js])
+        valid = K != i
+        J = J[valid]
+        K = K[valid]
+        if J.size == 0:
+            continue
+
+        d_ij = pts[J] - pts[i]
+        d_ik = pts[K] - pts[i]
+        d_jk = pts[J] - pts[K]
+        d2_ij = np.einsum("ij,ij->i", d_ij, d_ij)
+        d2_ik = np.einsum("ij,ij->i", d_ik, d_ik)
+        d2_jk = np.einsum("ij,ij->i", d_jk, d_jk)
+
+        # Squared-distance tests: dist < thr*(r_a + r_b)  <=>  d2 < (thr_r_a + thr_r_b)**2
+        ok_ik = d2_ik < (thr_r[i] + thr_r[K]) ** 2
+        ok_ij = d2_ij < (thr_r[i] + thr_r[J]) ** 2
+        ok_jk = d2_jk < (thr_r[J] + thr_r[K]) ** 2
+        keep = ok_ik & (ok_ij | ok_jk)
+        if not keep.any():
+            continue
+        Jk = J[keep].astype(np.int64)
+        Kk = K[keep].astype(np.int64)
+        a = np.minimum(i, np.minimum(Jk, Kk))
+        c = np.maximum(i, np.maximum(Jk, Kk))
+        b = i + Jk + Kk - a - c
+        triples.append((a << 42) | (b << 21) | c)
+
+    if not triples:
+        return np.empty(0, dtype=np.int64)
+    return np.concatenate(triples)
+
+
+_LUT_CACHE: dict[str, np.ndarray] = {}
+
+
+def _get_lut(cmap_name: str) -> np.ndarray:
+    """Return a cached (256,3) uint8 LUT for a Matplotlib colormap name."""
+    lut = _LUT_CACHE.get(cmap_name)
+    if lut is None:
+        import matplotlib.pyplot as plt
+
+        lut = (plt.get_cmap(cmap_name)(np.linspace(0.0, 1.0, 256))[:, :3] * 255).astype(np.uint8)
+        _LUT_CACHE[cmap_name] = lut
+    return lut
+
+
 def map_colors(
     values: np.ndarray,
     vmin: float | None = None,
@@ -77,14 +402,12 @@ def map_colors(
     robust_pct: float = 1.0,
 ) -> np.ndarray:
     """Map 1D values to RGB colors (0..255) using a Matplotlib colormap."""
-    import matplotlib.pyplot as plt
-
     vals = np.asarray(values, dtype=float)
     if vals.ndim != 1:
         vals = vals.reshape(-1)
     if robust and (vmin is None or vmax is None):
-        lo = np.percentile(vals, robust_pct)
-        hi = np.percentile(vals, 100 - robust_pct)
+        # One sort for both tails instead of two percentile calls
+        lo, hi = np.quantile(vals, [robust_pct / 100.0, 1.0 - robust_pct / 100.0])
         if vmin is None:
             vmin = float(lo)
         if vmax is None:
@@ -95,7 +418,12 @@ def map_colors(
         vmax = float(vals.max())
     if vmin == vmax:
         vmax = vmin + 1e-12
-    norm = plt.Normalize(vmin=vmin, vmax=vmax)
-    cmap = plt.get_cmap(cmap_name)
-    colors = (cmap(norm(vals))[:, :3] * 255).astype(np.uint8)
-    return colors
+    # Normalize in place and index the 256-entry colormap LUT directly; this
+    # matches Colormap.__call__, which truncates X*N and clamps to [0, N-1]
+    tmp = vals.copy()
+    np.subtract(tmp, vmin, out=tmp)
+    np.divide(tmp, vmax - vmin, out=tmp)
+    np.clip(tmp, 0.0, 1.0, out=tmp)
+    idx = (tmp * 256.0).astype(np.intp)
+    np.clip(idx, 0, 255, out=idx)
+    return _get_lut(cmap_name)[idx]
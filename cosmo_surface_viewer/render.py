@@ -21,6 +21,8 @@ def render_wrl_to_png(
     smooth_shading: bool = False,
     enable_aa: bool = True,
 ) -> None:
+    from vtk.util.numpy_support import numpy_to_vtk
+
     importer = vtk.vtkVRMLImporter()
     importer.SetFileName(str(wrl_filename))
     try:
@@ -34,34 +36,46 @@ def render_wrl_to_png(
     actors = renderer.GetActors()
     actors.InitTraversal()
 
-    meshes: list[pv.PolyData] = []
+    polydatas: list[vtk.vtkPolyData] = []
     actor = actors.GetNextActor()
     while actor:
         mapper = actor.GetMapper()
         if mapper:
             polydata = mapper.GetInput()
             if polydata:
-                meshes.append(pv.wrap(polydata))
+                polydatas.append(polydata)
         actor = actors.GetNextActor()
 
-    if not meshes:
+    if not polydatas:
         raise RuntimeError("No mesh could be extracted from the VRML file.")
-    mesh = meshes[0]
-    for m in meshes[1:]:
-        mesh = mesh.merge(m)
+    combined = polydatas[0]
+    if len(polydatas) > 1:
+        # One C++ streaming pass over all inputs instead of a pairwise merge
+        # chain that recopies the accumulated points at every step
+        append = vtk.vtkAppendPolyData()
+        for pd in polydatas:
+            append.AddInputData(pd)
+        append.Update()
+        combined = append.GetOutput()
 
     plotter = pv.Plotter(off_screen=off_screen)
 
+    n_points = combined.GetNumberOfPoints()
     colors_array = parse_vrml_colors(wrl_filename)
-    if colors_array.shape[0] > mesh.n_points:
-        colors_array = colors_array[: mesh.n_points]
-    elif 0 < colors_array.shape[0] < mesh.n_points:
-        n_repeat = int(np.ceil(mesh.n_points / colors_array.shape[0]))
-        colors_array = np.tile(colors_array, (n_repeat, 1))[: mesh.n_points]
-    if len(colors_array) == mesh.n_points + 1:
-        colors_array = colors_array[: mesh.n_points]
+    if colors_array.shape[0] > n_points:
+        colors_array = colors_array[: n_points]
+    elif 0 < colors_array.shape[0] < n_points:
+        n_repeat = int(np.ceil(n_points / colors_array.shape[0]))
+        colors_array = np.tile(colors_array, (n_repeat, 1))[:n_points]
+
+    # Hand the array to VTK without a copy (deep=False keeps colors_array as
+    # the backing store) instead of going through pyvista's point_data setter
+    colors_array = np.ascontiguousarray(colors_array)
+    vtk_colors = numpy_to_vtk(colors_array, deep=False)
+    vtk_colors.SetName("my_colors")
+    combined.GetPointData().SetScalars(vtk_colors)
 
-    mesh.point_data["my_colors"] = colors_array
+    mesh = pv.wrap(combined)
     plotter.add_mesh(mesh, scalars="my_colors", rgb=True, smooth_shading=smooth_shading)
 
     plotter.add_light(pv.Light(position=(0, 0, 1), color="white", intensity=0.2))
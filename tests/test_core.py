@@ -49,6 +49,24 @@ def test_parse_cpcm(tmp_path):
     assert owners.dtype == int
 
 
+def test_parse_cpcm_skips_malformed_rows(tmp_path):
+    cosmo = _import_cosmo()
+    sample = tmp_path / 'sample.cpcm'
+    content = []
+    content.append('3 # Number of surface points\n')
+    content.append('SURFACE POINTS\n')
+    content.append('hdr1\n')
+    content.append('hdr2\n')
+    content.append('0.0 0.0 0.0 0.1 0.2 0.5 0 0 0 1\n')
+    content.append('truncated row\n')
+    content.append('0.0 1.0 0.0 0.1 0.4 0.7 0 0 0 1\n')
+    sample.write_text(''.join(content))
+
+    points, charges, potentials, areas, owners = cosmo.parse_cpcm(sample)
+    assert points.shape == (2, 3)
+    assert np.isclose(charges[1], 0.7)
+
+
 def test_build_faces_simple():
     cosmo = _import_cosmo()
     pts = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
@@ -62,6 +80,40 @@ def test_build_faces_simple():
     assert found
 
 
+def test_build_faces_grid_matches_kdtree_on_thin_slab():
+    # Regression: narrow grids (1-2 cells along an axis) used to scan aliased
+    # out-of-range cells twice, evicting real neighbors from the capped list
+    cosmo = _import_cosmo()
+    mesh = sys.modules['cosmo_surface_viewer.mesh']
+    if not mesh._HAVE_NUMBA:
+        return
+    rng = np.random.default_rng(0)
+    pts = rng.uniform(0.0, 1.0, (150, 3))
+    pts[:, 2] *= 0.3  # thin slab: a single cell layer along z at this radius
+    areas = np.full(150, 0.5)
+    owners = np.zeros(150, dtype=int)
+    kwargs = dict(neighbor_radius=0.5, max_neighbors=6, neighbors_threshold=1.5)
+    faces_grid = cosmo.build_faces(pts, areas, owners, **kwargs)
+    mesh._HAVE_NUMBA = False
+    try:
+        faces_kdtree = cosmo.build_faces(pts, areas, owners, **kwargs)
+    finally:
+        mesh._HAVE_NUMBA = True
+    assert set(map(tuple, faces_grid.tolist())) == set(map(tuple, faces_kdtree.tolist()))
+
+
+def test_build_faces_delaunay():
+    cosmo = _import_cosmo()
+    pts = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [1.0, 1.0, 0.1]])
+    areas = np.array([10.0, 10.0, 10.0, 10.0])
+    owners = np.array([1, 1, 1, 1])
+    faces = cosmo.build_faces(pts, areas, owners, neighbors_threshold=2.0, method='delaunay')
+    assert faces.ndim == 2
+    assert faces.shape[1] == 3
+    # the four near-coplanar points triangulate into two triangles
+    assert len(faces) == 2
+
+
 def test_map_colors():
     cosmo = _import_cosmo()
     vals = np.array([-1.0, 0.0, 1.0])